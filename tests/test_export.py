@@ -0,0 +1,317 @@
+try:
+    import xmlrpc.client as xmlrpclib
+except ImportError:
+    import xmlrpclib
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import datetime
+import gzip
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+import six
+
+from utils import export
+
+CONFIG = """
+[main]
+username = main-user
+password = main-pass
+server = Web1
+
+[staging]
+username = staging-user
+password = staging-pass
+server = Web2
+"""
+
+DISK_USAGE = {
+    'home_directories': [
+        {'name': 'main-user', 'size': 1024},
+        {'name': 'staging-user', 'size': 2048},
+    ],
+    'total_disk_usage': 3072,
+}
+
+
+class ExportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_config(self, content):
+        path = os.path.join(self.directory, 'wfcreds')
+        with open(path, 'w') as config:
+            config.write(content)
+        return path
+
+
+class LoadAccountsTest(ExportTestCase):
+    def test_top_level_credentials(self):
+        path = self.write_config(
+            "username = me\npassword = secret\nserver = Web1\n"
+        )
+        self.assertEqual(
+            export.load_accounts(path), [('me', 'me', 'secret', 'Web1')]
+        )
+
+    def test_all_sections_by_default(self):
+        path = self.write_config(CONFIG)
+        self.assertEqual(export.load_accounts(path), [
+            ('main', 'main-user', 'main-pass', 'Web1'),
+            ('staging', 'staging-user', 'staging-pass', 'Web2'),
+        ])
+
+    def test_selected_sections(self):
+        path = self.write_config(CONFIG)
+        self.assertEqual(
+            export.load_accounts(path, ['staging']),
+            [('staging', 'staging-user', 'staging-pass', 'Web2')]
+        )
+
+    def test_unknown_section(self):
+        path = self.write_config(CONFIG)
+        with six.assertRaisesRegex(self, ValueError, 'accounts not found'):
+            export.load_accounts(path, ['missing'])
+
+    def test_names_without_sections(self):
+        path = self.write_config(
+            "username = me\npassword = secret\nserver = Web1\n"
+        )
+        with six.assertRaisesRegex(self, ValueError, 'no account sections'):
+            export.load_accounts(path, ['main'])
+
+    def test_missing_keys(self):
+        path = self.write_config("[main]\nusername = me\n")
+        with six.assertRaisesRegex(
+            self, ValueError, 'missing: password, server'
+        ):
+            export.load_accounts(path)
+
+    def test_missing_file(self):
+        with self.assertRaises(IOError):
+            export.load_accounts(os.path.join(self.directory, 'nope'))
+
+
+class RecordsTest(unittest.TestCase):
+    def test_struct_result(self):
+        records = list(export.iter_records('main', 'disk', DISK_USAGE))
+        self.assertEqual(sorted(records, key=json.dumps), sorted([
+            {
+                'account': 'main', 'action': 'disk',
+                'section': 'home_directories',
+                'data': {'name': 'main-user', 'size': 1024}
+            },
+            {
+                'account': 'main', 'action': 'disk',
+                'section': 'home_directories',
+                'data': {'name': 'staging-user', 'size': 2048}
+            },
+            {
+                'account': 'main', 'action': 'disk',
+                'section': 'total_disk_usage', 'data': 3072
+            },
+        ], key=json.dumps))
+
+    def test_list_result(self):
+        records = list(export.iter_records('main', 'ips', ['a', 'b']))
+        self.assertEqual(records, [
+            {'account': 'main', 'action': 'ips', 'data': 'a'},
+            {'account': 'main', 'action': 'ips', 'data': 'b'},
+        ])
+
+    def test_write_records(self):
+        stream = io.BytesIO()
+        count = export.write_records(stream, [{'b': 1, 'a': 2}, {'c': 3}])
+
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            stream.getvalue(), b'{"a": 2, "b": 1}\n{"c": 3}\n'
+        )
+
+    def test_write_records_dates(self):
+        stream = io.BytesIO()
+        export.write_records(stream, [{
+            'created': xmlrpclib.DateTime('20260101T12:30:00'),
+            'updated': datetime.datetime(2026, 1, 2, 8, 0),
+        }])
+
+        self.assertEqual(
+            stream.getvalue(),
+            b'{"created": "2026-01-01T12:30:00", '
+            b'"updated": "2026-01-02T08:00:00"}\n'
+        )
+
+
+@mock.patch('utils.webfaction.xmlrpclib.ServerProxy')
+class ExportTest(ExportTestCase):
+    accounts = [
+        ('main', 'main-user', 'main-pass', 'Web1'),
+        ('staging', 'staging-user', 'staging-pass', 'Web2'),
+    ]
+
+    def lines(self, stream):
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def test_exports_every_account(self, proxy):
+        server = proxy.return_value
+        server.login.return_value = ('session', {})
+        server.list_ips.return_value = [{'ip': '10.0.0.1'}]
+        server.list_disk_usage.return_value = DISK_USAGE
+        stream = io.BytesIO()
+
+        self.assertTrue(
+            export.export(self.accounts, ['ips', 'disk'], stream)
+        )
+
+        lines = self.lines(stream)
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(
+            [line['account'] for line in lines], ['main'] * 4 + ['staging'] * 4
+        )
+        self.assertEqual(server.login.call_count, 2)
+        server.list_ips.assert_called_with('session')
+
+    def test_login_failure_skips_account(self, proxy):
+        server = proxy.return_value
+        server.login.side_effect = [
+            xmlrpclib.Fault(1, 'bad credentials'), ('session', {})
+        ]
+        server.list_ips.return_value = ['10.0.0.2']
+        stream = io.BytesIO()
+
+        with mock.patch('utils.export.logger') as logger:
+            self.assertFalse(export.export(self.accounts, ['ips'], stream))
+
+        logger.exception.assert_called_once_with(
+            account='main', message="login failed"
+        )
+        self.assertEqual(self.lines(stream), [
+            {'account': 'staging', 'action': 'ips', 'data': '10.0.0.2'}
+        ])
+
+    def test_action_failure_continues(self, proxy):
+        server = proxy.return_value
+        server.login.return_value = ('session', {})
+        server.list_apps.side_effect = socket.error('connection reset')
+        server.list_ips.return_value = ['10.0.0.1']
+        stream = io.BytesIO()
+
+        with mock.patch('utils.export.logger') as logger:
+            self.assertFalse(
+                export.export(self.accounts[:1], ['apps', 'ips'], stream)
+            )
+
+        logger.exception.assert_called_once_with(
+            account='main', action='apps', message="export failed"
+        )
+        self.assertEqual(self.lines(stream), [
+            {'account': 'main', 'action': 'ips', 'data': '10.0.0.1'}
+        ])
+
+    def test_transport_failure_skips_to_next_account(self, proxy):
+        server = proxy.return_value
+        server.login.return_value = ('session', {})
+        server.list_ips.side_effect = [
+            httplib.BadStatusLine(''), ['10.0.0.2']
+        ]
+        stream = io.BytesIO()
+
+        with mock.patch('utils.export.logger') as logger:
+            self.assertFalse(export.export(self.accounts, ['ips'], stream))
+
+        logger.exception.assert_called_once_with(
+            account='main', action='ips', message="export failed"
+        )
+        self.assertEqual(self.lines(stream), [
+            {'account': 'staging', 'action': 'ips', 'data': '10.0.0.2'}
+        ])
+
+    def test_main_writes_gzip(self, proxy):
+        server = proxy.return_value
+        server.login.return_value = ('session', {})
+        server.list_ips.return_value = ['10.0.0.1']
+        config = self.write_config(CONFIG)
+        output = os.path.join(self.directory, 'out.jsonl.gz')
+
+        code = export.main(
+            ['-c', config, '-a', 'main', '-o', output, '--gzip', 'ips']
+        )
+
+        self.assertEqual(code, 0)
+        with gzip.open(output, 'rb') as stream:
+            self.assertEqual(
+                stream.read(),
+                b'{"account": "main", "action": "ips", "data": "10.0.0.1"}\n'
+            )
+
+    def test_main_reports_config_errors(self, proxy):
+        config = self.write_config(CONFIG)
+        with mock.patch('sys.stderr', new_callable=six.StringIO):
+            with self.assertRaises(SystemExit) as error:
+                export.main(['-c', config, '-a', 'missing', 'ips'])
+
+        self.assertEqual(error.exception.code, 2)
+        proxy.assert_not_called()
+
+    def test_main_reports_malformed_config(self, proxy):
+        config = self.write_config(
+            "username = a\nusername = b\npassword = c\nserver = Web1\n"
+        )
+        with mock.patch('sys.stderr', new_callable=six.StringIO):
+            with self.assertRaises(SystemExit) as error:
+                export.main(['-c', config, 'ips'])
+
+        self.assertEqual(error.exception.code, 2)
+        proxy.assert_not_called()
+
+    def test_main_reports_unwritable_output(self, proxy):
+        config = self.write_config(CONFIG)
+        output = os.path.join(self.directory, 'missing', 'out.jsonl')
+        with mock.patch('sys.stderr', new_callable=six.StringIO):
+            with self.assertRaises(SystemExit) as error:
+                export.main(['-c', config, '-o', output, 'ips'])
+
+        self.assertEqual(error.exception.code, 2)
+        proxy.assert_not_called()
+
+
+@mock.patch('utils.webfaction.xmlrpclib.ServerProxy')
+class StdoutTest(ExportTestCase):
+    line = b'{"account": "main", "action": "ips", "data": "10.0.0.1"}\n'
+
+    def run_main(self, proxy, *args):
+        server = proxy.return_value
+        server.login.return_value = ('session', {})
+        server.list_ips.return_value = ['10.0.0.1']
+        config = self.write_config(CONFIG)
+        buffer = mock.Mock(wraps=io.BytesIO())
+
+        with mock.patch('utils.export._stdout', return_value=buffer):
+            code = export.main(['-c', config, '-a', 'main'] + list(args))
+
+        self.assertEqual(code, 0)
+        self.assertFalse(buffer.close.called)
+        self.assertEqual(buffer.mock_calls[-1], mock.call.flush())
+        return buffer.getvalue()
+
+    def test_plain(self, proxy):
+        self.assertEqual(self.run_main(proxy, 'ips'), self.line)
+
+    def test_gzip(self, proxy):
+        output = self.run_main(proxy, '--gzip', 'ips')
+        with gzip.GzipFile(fileobj=io.BytesIO(output)) as stream:
+            self.assertEqual(stream.read(), self.line)
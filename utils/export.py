@@ -0,0 +1,260 @@
+"""
+Export WebFaction account stats as JSON Lines
+
+Usage:
+    python -m utils.export [-c CONFIG] [-a ACCOUNT ...] [-o FILE] [-z]
+        ACTION [ACTION ...]
+
+Accounts are read from a ConfigObj file (defaults to USER_CONFIG). A file
+holding top-level username/password/server keys describes a single account;
+one section per account describes a fleet:
+
+    [main]
+    username = <your-username>
+    password = <your-password>
+    server = <your-server-name>
+"""
+
+try:
+    import xmlrpc.client as xmlrpclib
+except ImportError:
+    import xmlrpclib
+try:
+    import http.client as httplib
+except ImportError:
+    import httplib
+import argparse
+import datetime
+import gzip
+import json
+import socket
+import sys
+from xml.parsers.expat import ExpatError
+
+from configobj import ConfigObj, ConfigObjError
+from structlog import get_logger
+
+from utils.webfaction import STATS_ACTIONS, USER_CONFIG, WebFactionBase
+
+logger = get_logger()
+
+# Failures that end one account or action but not the whole export.
+# xmlrpclib.Error covers Fault, ProtocolError and ResponseError.
+API_ERRORS = (
+    xmlrpclib.Error, httplib.HTTPException, socket.error, ExpatError
+)
+
+CREDENTIAL_KEYS = ('username', 'password', 'server')
+
+
+def _default(obj):
+    """
+    Render types json can't handle natively, with dates as ISO 8601
+    """
+    if isinstance(obj, xmlrpclib.DateTime):
+        return datetime.datetime.strptime(
+            obj.value, '%Y%m%dT%H:%M:%S'
+        ).isoformat()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _credentials(path, name, section):
+    missing = [
+        key for key in CREDENTIAL_KEYS if not section.get(key)
+    ]
+    if missing:
+        raise ValueError(
+            "account {name} in {path} is missing: {missing}".format(
+                name=name, path=path, missing=', '.join(missing)
+            )
+        )
+    return (name,) + tuple(section[key] for key in CREDENTIAL_KEYS)
+
+
+def load_accounts(path, names=None):
+    """Reads account credentials from a ConfigObj file
+
+    Args:
+        path (str): config file to read
+        names (list): account sections to select (optional). Defaults to
+            every section, or the top-level credentials if there are none
+
+    Returns:
+        list of (name, username, password, server) tuples
+    """
+    config = ConfigObj(path, file_error=True)
+
+    if not config.sections:
+        if names:
+            raise ValueError(
+                "{path} has no account sections".format(path=path)
+            )
+        return [_credentials(path, config.get('username'), config)]
+
+    names = names or config.sections
+    missing = [name for name in names if name not in config.sections]
+    if missing:
+        raise ValueError(
+            "accounts not found in {path}: {missing}".format(
+                path=path, missing=', '.join(missing)
+            )
+        )
+
+    return [_credentials(path, name, config[name]) for name in names]
+
+
+def iter_records(account, action, result):
+    """Splits a stats result into one record per entry
+
+    Lists yield a record per item. Structs (e.g. disk usage) yield a record
+    per item of each list they hold, tagged with the struct key, and a
+    single record for any other value.
+    """
+    base = {'account': account, 'action': action}
+
+    if isinstance(result, dict):
+        for section, value in result.items():
+            items = value if isinstance(value, list) else [value]
+            for item in items:
+                yield dict(base, section=section, data=item)
+    elif isinstance(result, list):
+        for item in result:
+            yield dict(base, data=item)
+    else:
+        yield dict(base, data=result)
+
+
+def write_records(stream, records):
+    """Writes records to a binary stream, one JSON document per line
+
+    Returns:
+        number of records written
+    """
+    encoder = json.JSONEncoder(default=_default, sort_keys=True)
+    count = 0
+
+    for record in records:
+        stream.write(encoder.encode(record).encode('utf-8') + b'\n')
+        count += 1
+
+    return count
+
+
+def export(accounts, actions, stream):
+    """Streams stats for every account/action pair to `stream`
+
+    Logs into each account once and reuses that session for all actions.
+    An account that can't log in, or an action that fails, is logged and
+    skipped so the rest of the fleet is still exported.
+
+    Returns:
+        True if every action succeeded, False otherwise
+    """
+    ok = True
+
+    for name, username, password, server in accounts:
+        try:
+            client = WebFactionBase(username, password, server)
+        except API_ERRORS:
+            logger.exception(account=name, message="login failed")
+            ok = False
+            continue
+
+        for action in actions:
+            # Call the API directly rather than through account_stats, which
+            # renders the whole result into a debug log line
+            method = getattr(client.server, STATS_ACTIONS[action])
+            try:
+                result = method(client.session_id)
+            except API_ERRORS:
+                logger.exception(
+                    account=name, action=action, message="export failed"
+                )
+                ok = False
+                continue
+
+            count = write_records(stream, iter_records(name, action, result))
+            logger.debug(account=name, action=action, records=count)
+
+    return ok
+
+
+def _stdout():
+    return getattr(sys.stdout, 'buffer', sys.stdout)
+
+
+def _open_output(path, compress):
+    """Opens the binary stream records are written to
+
+    Returns:
+        the stream, and whether it should be closed once the export is done
+    """
+    if path in (None, '-'):
+        if compress:
+            return gzip.GzipFile(fileobj=_stdout(), mode='wb'), True
+        return _stdout(), False
+
+    if compress:
+        return gzip.open(path, 'wb'), True
+    return open(path, 'wb'), True
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Export WebFaction account stats as JSON Lines"
+    )
+    parser.add_argument(
+        'actions', nargs='+', choices=sorted(STATS_ACTIONS),
+        metavar='ACTION',
+        help="stats to export: {actions}".format(
+            actions=', '.join(sorted(STATS_ACTIONS))
+        )
+    )
+    parser.add_argument(
+        '-c', '--config', default=USER_CONFIG,
+        help="credentials file (default: %(default)s)"
+    )
+    parser.add_argument(
+        '-a', '--account', action='append', dest='accounts',
+        help="config section to export; repeat for several (default: all)"
+    )
+    parser.add_argument(
+        '-o', '--output', default='-',
+        help="file to write to (default: stdout)"
+    )
+    parser.add_argument(
+        '-z', '--gzip', action='store_true', dest='compress',
+        help="gzip the output"
+    )
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        accounts = load_accounts(args.config, args.accounts)
+    except (IOError, ConfigObjError, ValueError) as e:
+        parser.error(str(e))
+
+    try:
+        stream, should_close = _open_output(args.output, args.compress)
+    except (IOError, OSError) as e:
+        parser.error(str(e))
+
+    try:
+        ok = export(accounts, args.actions, stream)
+    finally:
+        if should_close:
+            stream.close()
+        # a GzipFile over stdout doesn't flush stdout when it's closed
+        _stdout().flush()
+
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,6 +20,19 @@ logger = get_logger()
 API_URL = "https://api.webfaction.com/"
 USER_CONFIG = os.path.expanduser("~/.wfcreds")
 
+# account_stats actions and the API methods they call
+STATS_ACTIONS = {
+    'disk': 'list_disk_usage',
+    'bandwidth': 'list_bandwidth_usage',
+    'apps': 'list_apps',
+    'dbs': 'list_dbs',
+    'db_users': 'list_db_users',
+    'mailboxes': 'list_mailboxes',
+    'users': 'list_users',
+    'ips': 'list_ips',
+    'machines': 'list_machines'
+}
+
 
 class WebFactionDBUser(object):
     def __init__(self, username, password, db_type):
@@ -144,19 +157,7 @@ class WebFactionBase(object):
             on success, struct containing disk usage output
             False otherwise
         """
-        operations = {
-            'disk': self.server.list_disk_usage,
-            'bandwidth': self.server.list_bandwidth_usage,
-            'apps': self.server.list_apps,
-            'dbs': self.server.list_dbs,
-            'db_users': self.server.list_db_users,
-            'mailboxes': self.server.list_mailboxes,
-            'users': self.server.list_users,
-            'ips': self.server.list_ips,
-            'machines': self.server.list_machines
-        }
-
-        if action not in operations.keys():
+        if action not in STATS_ACTIONS.keys():
             raise Exception(
                 "Method {method_name} not implemented".format(
                     method_name=action
@@ -164,7 +165,8 @@ class WebFactionBase(object):
             )
 
         try:
-            result = operations[action](self.session_id)
+            operation = getattr(self.server, STATS_ACTIONS[action])
+            result = operation(self.session_id)
             self.logger.debug(action=action, result=result)
             return result
         except xmlrpclib.Fault: